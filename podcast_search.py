@@ -2,60 +2,132 @@
 
 import os
 import sys
+import logging
+import tempfile
+from pathlib import Path
+import orjson
 import requests
 from dotenv import load_dotenv
-from datetime import datetime
 import time
 import hashlib
+import threading
+from concurrent.futures import Future
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 API_KEY = os.getenv('PODCAST_INDEX_API_KEY')
 API_SECRET = os.getenv('PODCAST_INDEX_API_SECRET')
 BASE_URL = "https://api.podcastindex.org/api/1.0"
 
+# On-disk cache of API responses; search results change more slowly than episode lists
+CACHE_DIR = Path(os.getenv('XDG_CACHE_HOME', Path.home() / '.cache')) / 'podcast-search'
+SEARCH_CACHE_TTL = 6 * 60 * 60
+EPISODES_CACHE_TTL = 15 * 60
+
+# Key + secret never change, so hash them once and copy the SHA-1 state per call
+_SHA1_BASE = hashlib.sha1(f"{API_KEY}{API_SECRET}".encode('utf-8'))
+# X-Auth-Date has one-second resolution, so headers can be reused within a second
+_HEADER_CACHE = {"ts": 0, "hdr": None}
+
+# Retry policy and connection pool shared by every API session
+_RETRY = Retry(
+    total=3,
+    backoff_factor=1,
+    status_forcelist=(429, 500, 502, 503, 504),
+)
+_ADAPTER = HTTPAdapter(max_retries=_RETRY, pool_connections=4, pool_maxsize=20)
+
 def create_session():
     """Create a requests session with retry strategy"""
     session = requests.Session()
-    retry_strategy = Retry(
-        total=3,
-        backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("https://", adapter)
-    session.mount("http://", adapter)
+    session.mount("https://", _ADAPTER)
+    session.mount("http://", _ADAPTER)
+    session.headers.update({"User-Agent": "PodcastSearch/1.0"})
     return session
 
+# Shared session so keep-alive connections are reused across API calls
+_SESSION = create_session()
+
 def get_headers():
-    """Generate headers for API requests"""
-    auth_date = str(int(time.time()))
+    """Generate headers for API requests (cached per auth_date second)"""
+    ts = int(time.time())
+    if ts == _HEADER_CACHE["ts"]:
+        return _HEADER_CACHE["hdr"]
+
+    auth_date = str(ts)
     # Create the hash as specified in the API docs
-    hash_input = f"{API_KEY}{API_SECRET}{auth_date}"
-    auth_hash = hashlib.sha1(hash_input.encode('utf-8')).hexdigest()
-    
-    return {
+    h = _SHA1_BASE.copy()
+    h.update(auth_date.encode('ascii'))
+    auth_hash = h.hexdigest()
+
+    headers = {
         "X-Auth-Date": auth_date,
         "X-Auth-Key": API_KEY,
-        "Authorization": auth_hash,
-        "User-Agent": "PodcastSearch/1.0"
+        "Authorization": auth_hash
     }
+    _HEADER_CACHE["hdr"] = headers
+    _HEADER_CACHE["ts"] = ts
+    return headers
+
+def _cache_path(endpoint: str, params: dict) -> Path:
+    """Map an API endpoint and its params to a cache file"""
+    key = hashlib.sha1(orjson.dumps([endpoint, params], option=orjson.OPT_SORT_KEYS)).hexdigest()
+    return CACHE_DIR / f"{key}.json"
+
+def cache_get(endpoint: str, params: dict, ttl: int):
+    """Return cached data for a request if it is younger than ttl seconds, else None"""
+    path = _cache_path(endpoint, params)
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return None
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+def cache_put(endpoint: str, params: dict, data) -> None:
+    """Store data for a request; failures only cost a future cache miss"""
+    path = _cache_path(endpoint, params)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(data))
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Remove the temp file if the write or rename failed
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+    except OSError as e:
+        print(f"Warning: could not write cache file {path}: {str(e)}", file=sys.stderr)
 
 def search_podcasts(term: str) -> list:
     """Search for podcasts by term"""
     url = f"{BASE_URL}/search/byterm"
     params = {"q": term}
     
+    cached = cache_get(url, params, SEARCH_CACHE_TTL)
+    if cached is not None:
+        return cached
+    
     try:
-        session = create_session()
-        print(f"Making request to: {url}")
-        print(f"With headers: {get_headers()}")
-        response = session.get(url, headers=get_headers(), params=params, timeout=10)
+        logger.debug("Making request to: %s", url)
+        response = _SESSION.get(url, headers=get_headers(), params=params, timeout=10)
         response.raise_for_status()
-        return response.json().get("feeds", [])
+        feeds = orjson.loads(response.content).get("feeds", [])
+        # Empty results may be a transient API hiccup; don't pin them for the TTL
+        if feeds:
+            cache_put(url, params, feeds)
+        return feeds
     except requests.exceptions.ConnectionError as e:
         print(f"Connection error: Could not connect to {BASE_URL}. Please check your internet connection.", file=sys.stderr)
         print(f"Detailed error: {str(e)}", file=sys.stderr)
@@ -67,17 +139,31 @@ def search_podcasts(term: str) -> list:
     except requests.exceptions.RequestException as e:
         print(f"Error searching podcasts: {str(e)}", file=sys.stderr)
         return []
+    except orjson.JSONDecodeError as e:
+        print(f"Error searching podcasts: invalid JSON response ({str(e)})", file=sys.stderr)
+        return []
 
-def get_episodes(feed_id: int) -> list:
-    """Get episodes for a specific podcast feed"""
+def fetch_episodes(feed_id: int) -> list:
+    """Get episodes for a specific podcast feed, raising on request errors"""
     url = f"{BASE_URL}/episodes/byfeedid"
     params = {"id": feed_id, "max": 5}
     
+    cached = cache_get(url, params, EPISODES_CACHE_TTL)
+    if cached is not None:
+        return cached
+    
+    response = _SESSION.get(url, headers=get_headers(), params=params, timeout=10)
+    response.raise_for_status()
+    items = orjson.loads(response.content).get("items", [])
+    # Empty results may be a transient API hiccup; don't pin them for the TTL
+    if items:
+        cache_put(url, params, items)
+    return items
+
+def get_episodes(feed_id: int) -> list:
+    """Get episodes for a specific podcast feed"""
     try:
-        session = create_session()
-        response = session.get(url, headers=get_headers(), params=params, timeout=10)
-        response.raise_for_status()
-        return response.json().get("items", [])
+        return fetch_episodes(feed_id)
     except requests.exceptions.ConnectionError as e:
         print(f"Connection error: Could not connect to {BASE_URL}. Please check your internet connection.", file=sys.stderr)
         print(f"Detailed error: {str(e)}", file=sys.stderr)
@@ -89,10 +175,32 @@ def get_episodes(feed_id: int) -> list:
     except requests.exceptions.RequestException as e:
         print(f"Error getting episodes: {str(e)}", file=sys.stderr)
         return []
+    except orjson.JSONDecodeError as e:
+        print(f"Error getting episodes: invalid JSON response ({str(e)})", file=sys.stderr)
+        return []
+
+def prefetch(func, *args) -> Future:
+    """
+    Run func(*args) in a background thread and return a Future for its result
+    Daemon threads are used so requests still in flight never delay exit
+    (ThreadPoolExecutor joins its workers at interpreter shutdown)
+    """
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
 
 def format_date(timestamp: int) -> str:
     """Format Unix timestamp to readable date"""
-    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
 
 def display_podcast(podcast: dict, index: int) -> None:
     """Display podcast information in a formatted way"""
@@ -115,6 +223,9 @@ def display_episode(episode: dict) -> None:
     print(f"Download URL: {episode.get('enclosureUrl', 'No URL available')}")
 
 def main():
+    if os.getenv('DEBUG'):
+        logging.basicConfig(level=logging.DEBUG)
+
     if not API_KEY:
         print("Error: PODCAST_INDEX_API_KEY not found in .env file", file=sys.stderr)
         sys.exit(1)
@@ -133,6 +244,10 @@ def main():
             print("No podcasts found.")
             continue
 
+        # Fetch episodes for every listed podcast in the background; errors
+        # stay in the futures instead of printing over the selection prompt
+        prefetched = [prefetch(fetch_episodes, p['id']) for p in podcasts[:5]]
+
         # Display top 5 results
         print("\nTop 5 Results:")
         for i, podcast in enumerate(podcasts[:5]):
@@ -151,7 +266,13 @@ def main():
                     print(f"\nLatest episodes for: {selected_podcast.get('title')}")
                     
                     # Get and display episodes
-                    episodes = get_episodes(selected_podcast['id'])
+                    try:
+                        episodes = prefetched[index].result()
+                    except Exception:
+                        episodes = []
+                    if not episodes:
+                        # Prefetch failed or came back empty: retry and report errors
+                        episodes = get_episodes(selected_podcast['id'])
                     for episode in episodes:
                         display_episode(episode)
                     break
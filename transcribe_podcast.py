@@ -1,55 +1,223 @@
 #!/usr/bin/env python3
 
 import argparse
+import contextlib
+import functools
+import hashlib
 import os
+import queue
+import shutil
+import subprocess
 import sys
+import threading
 from pathlib import Path
+from typing import Iterator, Optional
 from urllib.parse import urlparse
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
 try:
-    import whisper
-    if not hasattr(whisper, 'load_model'):
-        print("Error: Incorrect whisper package installed. Please install openai-whisper:", file=sys.stderr)
-        print("pip install --upgrade --no-deps openai-whisper", file=sys.stderr)
-        sys.exit(1)
+    import ctranslate2
+    from faster_whisper import BatchedInferencePipeline, WhisperModel
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
 except ImportError:
-    print("Error: whisper not found. Please install openai-whisper:", file=sys.stderr)
-    print("pip install openai-whisper", file=sys.stderr)
+    print("Error: faster-whisper not found. Please install faster-whisper:", file=sys.stderr)
+    print("pip install faster-whisper", file=sys.stderr)
     sys.exit(1)
 
-def download_audio(url: str, output_path: str) -> bool:
+DOWNLOAD_CHUNK_SIZE = 1 << 16  # 64 KiB
+GPU_BATCH_SIZE = 16
+SAMPLE_RATE = 16000
+# Whisper works on 30 s windows; hand over enough of them to fill a GPU batch
+CHUNK_SECONDS = 30 * GPU_BATCH_SIZE
+# Each chunk ends at the longest pause within its last BOUNDARY_SECONDS
+BOUNDARY_SECONDS = 30
+# Decoded audio is passed around in blocks of BLOCK_SECONDS
+BLOCK_SECONDS = 30
+BLOCK_BYTES = BLOCK_SECONDS * SAMPLE_RATE * 4  # float32 samples
+# Decoded blocks buffered ahead of transcription (~2 MB each)
+PCM_QUEUE_SIZE = 32
+# Skip silence (music beds, ad gaps) longer than half a second
+VAD_PARAMETERS = {"min_silence_duration_ms": 500}
+# Finer, unpadded VAD used only to find pauses to cut chunks at
+BOUNDARY_VAD_PARAMETERS = {"min_silence_duration_ms": 200, "speech_pad_ms": 0}
+
+# Shared session so redirects to the same CDN host reuse connections
+_DL_SESSION = requests.Session()
+_DL_ADAPTER = HTTPAdapter(pool_maxsize=4)
+_DL_SESSION.mount("https://", _DL_ADAPTER)
+_DL_SESSION.mount("http://", _DL_ADAPTER)
+
+class DownloadError(RuntimeError):
+    """The podcast audio could not be downloaded or decoded"""
+
+def _ffmpeg_decoder(source: str) -> subprocess.Popen:
+    """Start ffmpeg decoding source (pipe:0 for stdin, or a URL) to 16 kHz mono float32 PCM on stdout"""
+    from_pipe = source == "pipe:0"
+    return subprocess.Popen(
+        [
+            "ffmpeg", "-loglevel", "error",
+            "-i", source,
+            "-f", "f32le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+            "pipe:1",
+        ],
+        stdin=subprocess.PIPE if from_pipe else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        # A failed pipe decode is retried from the URL, which reports its own errors
+        stderr=subprocess.DEVNULL if from_pipe else None,
+    )
+
+@contextlib.contextmanager
+def stream_audio(url: str, pcm_path: Optional[Path] = None):
     """
-    Download audio file from URL with progress bar
-    Returns True if successful, False otherwise
+    Download audio from URL and decode it while it arrives
+    The HTTP body is piped into ffmpeg; if ffmpeg cannot demux it from a pipe
+    (e.g. MP4 with its index at the end), ffmpeg reads the URL itself instead.
+    Context manager yielding an iterator of 16 kHz mono float32 blocks of
+    BLOCK_SECONDS each. The HTTP status is checked up front, so a bad URL
+    raises DownloadError on entry; the iterator raises it if the download or
+    decode fails later on. If pcm_path is given, the decoded PCM is also saved
+    there for load_pcm(), even when the consumer stops early
     """
     try:
-        response = requests.get(url, stream=True)
+        response = _DL_SESSION.get(url, stream=True, timeout=30)
         response.raise_for_status()
-        
-        # Get file size for progress bar
-        total_size = int(response.headers.get('content-length', 0))
-        
-        # Create progress bar
-        progress = tqdm(
-            total=total_size,
-            unit='iB',
-            unit_scale=True,
-            desc='Downloading podcast'
-        )
-        
-        # Download with progress
-        with open(output_path, 'wb') as file:
-            for data in response.iter_content(chunk_size=1024):
-                size = file.write(data)
-                progress.update(size)
-        progress.close()
-        
-        return True
-    except Exception as e:
-        print(f"Error downloading file: {str(e)}", file=sys.stderr)
-        return False
+    except requests.exceptions.RequestException as e:
+        raise DownloadError(f"Error downloading file: {str(e)}") from None
+    
+    blocks = queue.Queue(maxsize=PCM_QUEUE_SIZE)
+    errors = []
+    try:
+        ffmpeg = _ffmpeg_decoder("pipe:0")
+    except BaseException:
+        response.close()
+        raise
+    processes = [ffmpeg]
+    # Held while starting a process, so cleanup can't miss a late fallback
+    processes_lock = threading.Lock()
+    consumer_gone = threading.Event()
+    # Set once the consumer has read the end-of-stream marker
+    drained = threading.Event()
+    abort = threading.Event()
+    # Written under a temporary name and renamed only once decoding succeeds
+    pcm_part = pcm_path.with_name(pcm_path.name + ".part") if pcm_path else None
+
+    def offer(item):
+        # Hand item to the consumer, unless it has stopped reading
+        while not consumer_gone.is_set():
+            try:
+                blocks.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                pass
+
+    def download():
+        try:
+            # Undo any transfer Content-Encoding when reading the raw stream
+            response.raw.decode_content = True
+            
+            # Get file size for progress bar
+            total_size = int(response.headers.get('content-length', 0))
+            
+            # Feed ffmpeg with progress; copyfileobj keeps the copy loop in C
+            with tqdm.wrapattr(response.raw, "read", total=total_size,
+                               desc='Downloading podcast') as raw:
+                shutil.copyfileobj(raw, ffmpeg.stdin, length=DOWNLOAD_CHUNK_SIZE)
+        except BrokenPipeError:
+            pass  # ffmpeg stopped reading; decode() checks what it produced
+        except Exception as e:
+            errors.append(f"Error downloading file: {str(e)}")
+        finally:
+            response.close()
+            try:
+                ffmpeg.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    def decode():
+        emitted = False
+
+        def pump(process):
+            # Forward a decoder's PCM to the consumer (and the sidecar)
+            nonlocal emitted
+            while data := process.stdout.read(BLOCK_BYTES):
+                if pcm_file:
+                    pcm_file.write(data)
+                offer(np.frombuffer(data, dtype=np.float32))
+                emitted = True
+            return process.wait()
+
+        # This thread owns pcm_part: it is renamed on success, removed otherwise
+        try:
+            with open(pcm_part, 'wb') if pcm_part else contextlib.nullcontext() as pcm_file:
+                returncode = pump(ffmpeg)
+                downloader.join()
+                if errors or abort.is_set():
+                    return
+                if not emitted:
+                    # Not demuxable from a pipe: let ffmpeg fetch the URL itself,
+                    # seeking with range requests
+                    with processes_lock:
+                        if abort.is_set():
+                            return
+                        fallback = _ffmpeg_decoder(url)
+                        processes.append(fallback)
+                    returncode = pump(fallback)
+                if returncode != 0 or not emitted:
+                    errors.append("Error decoding audio: ffmpeg could not decode the stream")
+                    return
+            if pcm_part:
+                os.replace(pcm_part, pcm_path)
+        except Exception as e:
+            errors.append(f"Error decoding audio: {str(e)}")
+        finally:
+            if pcm_part:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(pcm_part)
+            offer(None)
+
+    def iter_blocks():
+        while (block := blocks.get()) is not None:
+            yield block
+        drained.set()
+        if errors:
+            raise DownloadError(errors[0])
+
+    downloader = threading.Thread(target=download, daemon=True)
+    decoder = threading.Thread(target=decode, daemon=True)
+    downloader.start()
+    decoder.start()
+
+    # Runs even if the consumer never starts on the iterator (e.g. the model
+    # failed to load), so ffmpeg is always cleaned up
+    keep_pcm = pcm_part is not None
+    try:
+        yield iter_blocks()
+    except BaseException:
+        keep_pcm = False  # interrupted: don't make the user wait for the sidecar
+        raise
+    finally:
+        consumer_gone.set()
+        if keep_pcm and not drained.is_set():
+            # The consumer stopped early (e.g. transcription failed): let the
+            # download and decode finish so a retry can reuse the audio
+            print(f"Finishing the download to save decoded audio to {pcm_path} for a retry...")
+            decoder.join()
+        with processes_lock:
+            abort.set()
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+def load_pcm(pcm_path: Path) -> Iterator[np.ndarray]:
+    """Yield BLOCK_SECONDS blocks from PCM previously saved by stream_audio()"""
+    samples = np.memmap(pcm_path, dtype=np.float32, mode='r')
+    step = BLOCK_SECONDS * SAMPLE_RATE
+    for start in range(0, len(samples), step):
+        yield np.array(samples[start:start + step])
 
 def get_output_filename(url: str) -> str:
     """Generate output filename from URL"""
@@ -58,23 +226,165 @@ def get_output_filename(url: str) -> str:
     name_without_ext = os.path.splitext(base_name)[0]
     return f"{name_without_ext}_transcript.txt"
 
-def transcribe_audio(audio_path: str, output_path: str, model_name: str = "turbo") -> bool:
+def get_audio_stem(url: str) -> str:
+    """Generate a file stem for downloaded/decoded audio (hashed, as episode names often repeat)"""
+    parsed = urlparse(url)
+    base_name = os.path.basename(parsed.path)
+    name_without_ext = os.path.splitext(base_name)[0]
+    url_hash = hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]
+    return f"{name_without_ext}_{url_hash}"
+
+def _split_point(audio: np.ndarray) -> int:
+    """Return where to end a chunk of audio: mid-way through its longest late pause"""
+    search_start = max(0, len(audio) - BOUNDARY_SECONDS * SAMPLE_RATE)
+    tail = audio[search_start:]
+    speech = get_speech_timestamps(tail, VadOptions(**BOUNDARY_VAD_PARAMETERS))
+    if not speech:
+        return len(audio)  # no speech near the end, so no word to split
+    gaps = [(0, speech[0]["start"])]
+    gaps += [(a["end"], b["start"]) for a, b in zip(speech, speech[1:])]
+    gaps.append((speech[-1]["end"], len(tail)))
+    start, end = max(gaps, key=lambda gap: gap[1] - gap[0])
+    if end <= start:
+        return len(audio)  # continuous speech: fall back to a hard cut
+    return search_start + (start + end) // 2
+
+def _chunks(blocks: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+    """Regroup decoded blocks into ~CHUNK_SECONDS chunks that end in a pause"""
+    chunk_samples = CHUNK_SECONDS * SAMPLE_RATE
+    pending = np.empty(0, dtype=np.float32)
+    for block in blocks:
+        pending = np.concatenate((pending, block))
+        while len(pending) >= chunk_samples:
+            cut = _split_point(pending[:chunk_samples])
+            yield pending[:cut]
+            pending = pending[cut:]
+    if len(pending):
+        yield pending
+
+def select_backend() -> tuple:
+    """
+    Pick the (backend, device) pair to transcribe with
+    faster-whisper is used where CTranslate2 can reach the GPU (CUDA) or on
+    CPU-only machines; PyPI CTranslate2 builds have no ROCm kernels, so GPUs
+    that only torch can see (ROCm) stay on openai-whisper
+    """
+    if ctranslate2.get_cuda_device_count() > 0:
+        return "faster-whisper", "cuda"
+    # torch is only installed for the ROCm path; it reports ROCm devices
+    # through the cuda API as well
+    try:
+        import torch
+    except ImportError:
+        return "faster-whisper", "cpu"
+    if torch.cuda.is_available():
+        return "openai-whisper", "cuda"
+    return "faster-whisper", "cpu"
+
+@functools.lru_cache(maxsize=2)
+def _load(model_name: str, device: str):
+    """Load an openai-whisper model once per (name, device) and reuse it"""
+    try:
+        import whisper
+    except ImportError:
+        raise RuntimeError("whisper not found. Please install openai-whisper: pip install openai-whisper") from None
+    if not hasattr(whisper, 'load_model'):
+        raise RuntimeError("Incorrect whisper package installed. Please install openai-whisper: "
+                           "pip install --upgrade --no-deps openai-whisper")
+    return whisper.load_model(model_name, device=device)
+
+@functools.lru_cache(maxsize=2)
+def _load_faster(model_name: str, device: str) -> WhisperModel:
+    """Load a faster-whisper model once per (name, device) and reuse it"""
+    compute_type = "float16" if device == "cuda" else "int8"
+    return WhisperModel(model_name, device=device, compute_type=compute_type)
+
+def _faster_whisper_transcriber(model_name: str, device: str):
+    """Return a function mapping (audio array, language) to (transcript texts, language)"""
+    model = _load_faster(model_name, device)
+    if device == "cuda":
+        # Batch the speech chunks found by VAD to keep the GPU busy
+        pipeline = BatchedInferencePipeline(model=model)
+        run = functools.partial(pipeline.transcribe, batch_size=GPU_BATCH_SIZE)
+    else:
+        run = model.transcribe
+
+    def transcribe(audio: np.ndarray, language: Optional[str]) -> tuple:
+        segments, info = run(
+            audio,
+            language=language,
+            beam_size=5,
+            vad_filter=True,
+            vad_parameters=VAD_PARAMETERS,
+        )
+        # Only trust a detected language if the chunk contained speech
+        if info.duration_after_vad:
+            language = info.language
+        # segments is a generator: texts are produced as they are decoded
+        return (segment.text for segment in segments), language
+
+    return transcribe
+
+def _speech_only(audio: np.ndarray) -> np.ndarray:
+    """Drop the silent stretches of audio using faster-whisper's Silero VAD"""
+    speech = get_speech_timestamps(audio, VadOptions(**VAD_PARAMETERS))
+    if not speech:
+        return audio[:0]
+    return np.concatenate([audio[ts["start"]:ts["end"]] for ts in speech])
+
+def _openai_whisper_transcriber(model_name: str, device: str):
+    """Return a function mapping (audio array, language) to (transcript texts, language)"""
+    model = _load(model_name, device)
+
+    def transcribe(audio: np.ndarray, language: Optional[str]) -> tuple:
+        # openai-whisper has no VAD of its own: strip silence before decoding
+        audio = _speech_only(audio)
+        if not len(audio):
+            return iter(()), language
+        result = model.transcribe(audio, language=language, fp16=(device == "cuda"))
+        return (segment["text"] for segment in result["segments"]), result["language"]
+
+    return transcribe
+
+def transcribe_audio(audio_blocks: Iterator[np.ndarray], output_path: str, model_name: str = "turbo") -> bool:
     """
-    Transcribe audio file using Whisper
-    Returns True if successful, False otherwise
+    Transcribe decoded audio blocks using Whisper
+    Returns True if successful, False otherwise; DownloadError from
+    audio_blocks is passed on so it is reported as a download failure
     """
     try:
-        print("Loading Whisper model...")
-        model = whisper.load_model(model_name)
+        backend, device = select_backend()
+        print(f"Loading Whisper model on {device} ({backend})...")
+        if backend == "faster-whisper":
+            transcribe = _faster_whisper_transcriber(model_name, device)
+        else:
+            transcribe = _openai_whisper_transcriber(model_name, device)
         
         print("Transcribing audio... This may take a while.")
-        result = model.transcribe(audio_path)
-        
-        # Save transcript
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(result["text"])
+        # Detected on the first chunk with speech, then pinned so chunks that
+        # open with music or an ad can't switch language mid-episode
+        language = None
+        # Written under a temporary name so a failed run never clobbers an
+        # earlier transcript or leaves a partial one behind
+        part_path = f"{output_path}.part"
+        try:
+            with open(part_path, "w", encoding="utf-8") as f:
+                for chunk in _chunks(audio_blocks):
+                    texts, language = transcribe(chunk, language)
+                    # Write each segment as soon as it is available
+                    for text in texts:
+                        text = text.strip()
+                        if text:
+                            f.write(text + "\n")
+            os.replace(part_path, output_path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(part_path)
+            raise
         
         return True
+    except DownloadError:
+        raise
     except Exception as e:
         print(f"Error during transcription: {str(e)}", file=sys.stderr)
         return False
@@ -84,6 +394,8 @@ def main():
     parser.add_argument("url", help="URL of the podcast episode (MP3)")
     parser.add_argument("--model", default="turbo", help="Whisper model to use (default: turbo)")
     parser.add_argument("--output", "-o", help="Output file path (optional)")
+    parser.add_argument("--keep-audio", action="store_true",
+                        help="Keep the decoded 16 kHz audio in transcripts/ so re-runs skip the download")
     args = parser.parse_args()
 
     # Create output directory if it doesn't exist
@@ -93,27 +405,38 @@ def main():
     # Generate output filename if not provided
     output_path = args.output if args.output else output_dir / get_output_filename(args.url)
     
-    # Temporary file for downloaded audio
-    temp_audio = output_dir / "temp_audio.mp3"
-    
+    # Decoded audio saved by an earlier --keep-audio run
+    audio_stem = get_audio_stem(args.url)
+    pcm_path = output_dir / f"{audio_stem}.f32"
     try:
-        # Download audio
-        print(f"Downloading podcast from {args.url}")
-        if not download_audio(args.url, temp_audio):
+        pcm_size = pcm_path.stat().st_size
+    except FileNotFoundError:
+        pcm_size = 0
+    
+    if pcm_size:
+        print(f"Using decoded audio from {pcm_path}")
+        print(f"Transcribing to {output_path}")
+        transcribed = transcribe_audio(load_pcm(pcm_path), output_path, args.model)
+    else:
+        if shutil.which("ffmpeg") is None:
+            print("Error: ffmpeg not found. Please install ffmpeg.", file=sys.stderr)
             sys.exit(1)
         
-        # Transcribe
+        # Download, decode and transcribe concurrently
+        print(f"Downloading podcast from {args.url}")
         print(f"Transcribing to {output_path}")
-        if not transcribe_audio(str(temp_audio), output_path, args.model):
+        try:
+            with stream_audio(args.url, pcm_path if args.keep_audio else None) as audio_blocks:
+                transcribed = transcribe_audio(audio_blocks, output_path, args.model)
+        except DownloadError as e:
+            print(str(e), file=sys.stderr)
             sys.exit(1)
-        
-        print(f"\nTranscription completed successfully!")
-        print(f"Transcript saved to: {output_path}")
-        
-    finally:
-        # Clean up temporary file
-        if temp_audio.exists():
-            temp_audio.unlink()
+    
+    if not transcribed:
+        sys.exit(1)
+    
+    print(f"\nTranscription completed successfully!")
+    print(f"Transcript saved to: {output_path}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file